@@ -0,0 +1,184 @@
+import codecs, json, os, re, threading, time
+from concurrent.futures import ThreadPoolExecutor
+import urllib3
+from lxml import etree
+
+# ask for a compressed body; urllib3 decodes it while streaming, and only
+# advertises the encodings it can decode here (brotli/zstd when installed)
+HEADERS = urllib3.make_headers(user_agent = 'Mozilla/5.0', accept_encoding = True)
+_WHITESPACE = re.compile(r'\s+')
+_CHARSET = re.compile(r'charset=["\']?([\w.:-]+)', re.I)
+# ETag / Last-Modified and freshness of the page each output file was
+# last written from, keyed by url
+CACHE_FILE = '.http_cache.json'
+# bump whenever scrape() changes what it writes for the same page, so that
+# output files saved by an older version are downloaded and rebuilt once
+OUTPUT_VERSION = 1
+_cache_lock = threading.Lock()
+# one pool for every fetch, so later requests to a host reuse its open
+# keep-alive connection instead of paying the TCP/TLS handshake again
+_http = urllib3.PoolManager()
+# unread bytes of a page worth downloading just to keep its connection
+DRAIN_LIMIT = 64 * 1024
+
+class ArticleNotFound(Exception):
+    pass
+
+def _load_cache():
+    try:
+        with open(CACHE_FILE) as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+def _max_age(headers):
+    # Cache-Control directives are case-insensitive, comma-separated tokens;
+    # no-cache / no-store (even field-qualified) mean always revalidate
+    directives = {}
+    for directive in headers.get('Cache-Control', '').lower().split(','):
+        name, _, value = directive.partition('=')
+        directives[name.strip()] = value.strip().strip('"')
+    if 'no-cache' in directives or 'no-store' in directives or 'max-age' not in directives:
+        return 0
+    try:
+        return int(directives['max-age']) - int(headers.get('Age', 0))
+    except ValueError:
+        return 0
+
+def _extraction(locator):
+    # what the output file depends on besides the page itself
+    return '%s.%s/%d' % (locator.__module__, locator.__qualname__, OUTPUT_VERSION)
+
+def _remember(url, headers, extraction = None, revalidated = False):
+    # a 304 may repeat only some of the headers, so it updates the previous
+    # entry; a full download replaces it
+    with _cache_lock:
+        cache = _load_cache()
+        entry = cache.get(url, {}) if revalidated else {'extraction' : extraction}
+        if headers.get('ETag'):
+            entry['etag'] = headers['ETag']
+        if headers.get('Last-Modified'):
+            entry['last_modified'] = headers['Last-Modified']
+        entry['expires'] = time.time() + _max_age(headers)
+        cache[url] = entry
+        # fetch() reads the file without the lock, so it must never see it
+        # half written; replace it in one step instead of rewriting in place
+        with open(CACHE_FILE + '.tmp', 'w') as f:
+            json.dump(cache, f, indent = 1)
+        os.replace(CACHE_FILE + '.tmp', CACHE_FILE)
+
+def _has_output(outfile):
+    try:
+        return outfile is not None and os.path.getsize(outfile) > 0
+    except OSError:
+        return False
+
+def fetch(url, outfile = None, extraction = None):
+    # returns the streamed response, or None when outfile already holds this
+    # page: either it is still fresh by the server's max-age, so the server
+    # is not asked at all, or the server answers 304 to a conditional GET.
+    # The cache entry only counts if outfile was built the same way
+    headers = dict(HEADERS)
+    cached = _load_cache().get(url, {}) if _has_output(outfile) else {}
+    if cached.get('extraction') == extraction:
+        if cached.get('expires', 0) > time.time():
+            return None
+        if cached.get('etag'):
+            headers['If-None-Match'] = cached['etag']
+        if cached.get('last_modified'):
+            headers['If-Modified-Since'] = cached['last_modified']
+    response = _http.request('GET', url, headers = headers, preload_content = False)
+    if response.status == 304:
+        response.release_conn()
+        _remember(url, response.headers, revalidated = True)
+        return None
+    if response.status != 200:
+        response.drain_conn()
+        response.release_conn()
+        raise urllib3.exceptions.HTTPError('GET %s returned HTTP %d' % (url, response.status))
+    return response
+
+def _release(response):
+    # only a body read to the end leaves the connection reusable. extract()
+    # usually stops part way through a page; a short remainder is cheaper to
+    # read and drop than a new TCP/TLS handshake, a long one (or one of
+    # unknown length) is not, so that connection is closed instead
+    if not response.closed:
+        remaining = response.length_remaining
+        if remaining is None or remaining > DRAIN_LIMIT:
+            response.close()
+            return
+        response.drain_conn()
+    response.release_conn()
+
+def charset(response):
+    # the encoding the server declared for the page, if it is one we know;
+    # an unknown label is ignored and the parser sniffs the page instead
+    found = _CHARSET.search(response.headers.get('Content-Type', ''))
+    if not found:
+        return None
+    try:
+        codecs.lookup(found.group(1))
+    except LookupError:
+        return None
+    return found.group(1)
+
+def extract(stream, match, encoding = None):
+    # parse the page only as far as the end of the first div accepted by
+    # match; divs that close before it are dropped as we go, so neither the
+    # rest of the page nor the tree in front of the article is kept around.
+    # The raw bytes go straight to libxml2; passing the declared encoding
+    # skips its sniffing and its latin-1 fallback on pages with no <meta charset>
+    try:
+        events = etree.iterparse(stream, events = ('start', 'end'), tag = 'div', html = True, encoding = encoding)
+    except LookupError:
+        # a label Python knows but libxml2 does not (e.g. utf-8-sig); this is
+        # raised before anything is read, so sniffing is still possible
+        events = etree.iterparse(stream, events = ('start', 'end'), tag = 'div', html = True)
+    target = None
+    for event, div in events:
+        if event == 'start':
+            if target is None and match(div):
+                target = div
+        elif div is target:
+            return ''.join(div.itertext())
+        elif target is None:
+            div.clear()
+            while div.getprevious() is not None:
+                del div.getparent()[0]
+    raise ArticleNotFound('article not found in page')
+
+# locators: extract() calls them on every div it meets, so they stay plain
+# attribute lookups rather than per-element XPath evaluations
+def article_body(div):
+    return div.get('itemprop') == 'articleBody'
+
+def full_details(div):
+    return 'full-details' in div.get('class', '').split()
+
+def scrape(url, locator, outfile):
+    # returns the text written to outfile, or None when it was left as is
+    extraction = _extraction(locator)
+    response = fetch(url, outfile, extraction)
+    if response is None:
+        return None  # unchanged since the last run
+    try:
+        content = _WHITESPACE.sub(' ', extract(response, locator, charset(response))).strip()
+    finally:
+        _release(response)
+    with open(outfile, 'wb') as f:
+        f.write(content.encode('utf-8'))
+    # only now that outfile holds this version may a later run skip it
+    _remember(url, response.headers, extraction)
+    return content
+
+def main():
+    import demo, secondurl, thirdurl
+    scripts = (demo, secondurl, thirdurl)
+    # the pages are independent, so scraping them side by side makes the
+    # wall clock the slowest page instead of the sum of all of them
+    with ThreadPoolExecutor(max_workers = len(scripts)) as pool:
+        list(pool.map(lambda script: script.main(), scripts))
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file